@@ -0,0 +1,233 @@
+"""Instrumentation légère partagée par les services (ingestion, nlp, dashboard).
+
+Compteurs et histogrammes en mémoire, exposés au format Prometheus
+(METRICS_PORT) et/ou vidés périodiquement en JSON (METRICS_JSON_PATH).
+Profilage optionnel par échantillonnage avec cProfile ou pyinstrument
+(PROFILER, PROFILE_SAMPLE_RATE, PROFILE_DIR).
+"""
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+# Bornes des histogrammes (secondes), de la requête SQL au parse spaCy d'un long article
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Stocke compteurs et histogrammes indexés par (nom, labels)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def render_prometheus(self):
+        """Sérialise les métriques au format texte Prometheus"""
+        lines = []
+        with self.lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), hist in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Vue JSON-sérialisable des métriques (compteurs + résumé des histogrammes)"""
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": hist.count,
+                        "sum": hist.sum,
+                        "mean": hist.sum / hist.count if hist.count else 0.0,
+                        "buckets": dict(zip(map(str, hist.buckets), hist.counts)),
+                    }
+                    for (name, labels), hist in self.histograms.items()
+                ],
+            }
+
+    def dump_json(self, path):
+        """Écrit un instantané JSON (écriture atomique via fichier temporaire)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = MetricsRegistry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+@contextmanager
+def timed(name, **labels):
+    """Mesure la durée d'un bloc dans l'histogramme `name` (secondes).
+
+    Utilisable aussi comme décorateur : @timed("db_query_seconds", op="upsert")
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, **labels)
+
+
+@contextmanager
+def profiled(name):
+    """Profile un échantillon des exécutions du bloc si PROFILER est défini.
+
+    PROFILER=cprofile|pyinstrument, PROFILE_SAMPLE_RATE (défaut 0.01),
+    PROFILE_DIR (défaut /tmp/profiles). Sans PROFILER, le coût est négligeable.
+    """
+    profiler = os.getenv("PROFILER", "").lower()
+    if not profiler or random.random() >= float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")):
+        yield
+        return
+
+    profile_dir = os.getenv("PROFILE_DIR", "/tmp/profiles")
+    os.makedirs(profile_dir, exist_ok=True)
+    base_path = os.path.join(profile_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+    if profiler == "pyinstrument" and PyinstrumentProfiler is not None:
+        sampler = PyinstrumentProfiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            with open(f"{base_path}.html", "w", encoding="utf-8") as f:
+                f.write(sampler.output_html())
+    else:
+        sampler = cProfile.Profile()
+        sampler.enable()
+        try:
+            yield
+        finally:
+            sampler.disable()
+            sampler.dump_stats(f"{base_path}.prof")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host="0.0.0.0"):
+    """Expose /metrics (format Prometheus) dans un thread daemon"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_json_dumper(path, interval=30.0):
+    """Écrit périodiquement un instantané JSON dans un thread daemon"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            registry.dump_json(path)
+
+    threading.Thread(target=loop, name="metrics-json", daemon=True).start()
+
+
+_setup_done = False
+_setup_lock = threading.Lock()
+
+
+def setup_from_env():
+    """Démarre les exports configurés par variables d'environnement (idempotent)"""
+    global _setup_done
+    with _setup_lock:
+        if _setup_done:
+            return
+        _setup_done = True
+        if os.getenv("METRICS_PORT"):
+            start_http_server(int(os.getenv("METRICS_PORT")))
+        if os.getenv("METRICS_JSON_PATH"):
+            start_json_dumper(os.getenv("METRICS_JSON_PATH"), float(os.getenv("METRICS_JSON_INTERVAL", "30")))
+
+
+def flush():
+    """Écrit un dernier instantané JSON si METRICS_JSON_PATH est défini (fin de crawl / de batch)"""
+    if os.getenv("METRICS_JSON_PATH"):
+        registry.dump_json(os.getenv("METRICS_JSON_PATH"))
@@ -7,6 +7,7 @@ import os
 import psycopg2
 from datetime import datetime
 from collections import Counter
+from common.metrics import setup_from_env, timed
 
 # Configuration de la page
 st.set_page_config(
@@ -16,6 +17,7 @@ st.set_page_config(
 )
 
 @st.cache_data
+@timed("dashboard_loader_seconds", loader="load_nlp_results")
 def load_nlp_results():
     """Charge les résultats NLP depuis le fichier JSON"""
     try:
@@ -24,18 +26,26 @@ def load_nlp_results():
     except FileNotFoundError:
         st.error("Fichier nlp_results.json non trouvé. Lance d'abord le pipeline NLP.")
         return []
+    except json.JSONDecodeError:
+        st.error("Fichier nlp_results.json illisible. Relance le pipeline NLP.")
+        return []
+
+def get_db_connection():
+    """Ouvre une connexion à la base PostgreSQL"""
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", "5432")),
+        dbname=os.getenv("DB_NAME", "geopolitics"),
+        user=os.getenv("DB_USER", "osint"),
+        password=os.getenv("DB_PASSWORD", "secret"),
+    )
 
 @st.cache_data
+@timed("dashboard_loader_seconds", loader="load_articles_from_db")
 def load_articles_from_db():
     """Charge les articles depuis la base de données"""
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=int(os.getenv("DB_PORT", "5432")),
-            dbname=os.getenv("DB_NAME", "geopolitics"),
-            user=os.getenv("DB_USER", "osint"),
-            password=os.getenv("DB_PASSWORD", "secret"),
-        )
+        conn = get_db_connection()
         
         query = """
         SELECT id, title, url, date_published, date_collected, source
@@ -52,37 +62,95 @@ def load_articles_from_db():
         st.error(f"Erreur de connexion à la base : {e}")
         return pd.DataFrame()
 
+@st.cache_data
+@timed("dashboard_loader_seconds", loader="load_entity_cooccurrence")
+def load_entity_cooccurrence(limit=50):
+    """Charge les paires d'entités les plus fréquentes depuis le graphe précalculé"""
+    try:
+        conn = get_db_connection()
+        
+        query = """
+        SELECT entity_a, entity_b, SUM(doc_count) AS weight
+        FROM entity_cooccurrence
+        GROUP BY entity_a, entity_b
+        ORDER BY weight DESC
+        LIMIT %(limit)s
+        """
+        
+        df = pd.read_sql(query, conn, params={"limit": limit})
+        conn.close()
+        return df
+        
+    except Exception as e:
+        st.error(f"Erreur de chargement du graphe d'entités : {e}")
+        return pd.DataFrame()
+
+@st.cache_data
+@timed("dashboard_loader_seconds", loader="load_entity_trends")
+def load_entity_trends(top_n=8):
+    """Charge l'évolution hebdomadaire des entités les plus citées"""
+    try:
+        conn = get_db_connection()
+        
+        query = """
+        WITH top_entities AS (
+            SELECT entity
+            FROM entity_documents
+            GROUP BY entity
+            ORDER BY COUNT(*) DESC
+            LIMIT %(top_n)s
+        )
+        SELECT d.window_start, d.entity, COUNT(*) AS documents
+        FROM entity_documents d
+        JOIN top_entities t ON t.entity = d.entity
+        GROUP BY d.window_start, d.entity
+        ORDER BY d.window_start
+        """
+        
+        df = pd.read_sql(query, conn, params={"top_n": top_n})
+        conn.close()
+        return df
+        
+    except Exception as e:
+        st.error(f"Erreur de chargement des tendances d'entités : {e}")
+        return pd.DataFrame()
+
 def create_event_summary(nlp_results):
-    """Crée un résumé des événements détectés"""
-    all_events = []
+    """Crée un résumé des événements détectés (colonnes utilisées par les graphiques uniquement)"""
+    # Construction colonne par colonne + catégories : pas de dict ni de chaîne dupliquée par ligne
+    doc_ids, event_types, keywords = [], [], []
     for doc in nlp_results:
         for event in doc['events']:
-            all_events.append({
-                'doc_id': doc['doc_id'],
-                'event_type': event['event_type'],
-                'keyword': event['keyword'],
-                'context': event['context'],
-                'targets': event['targets'],
-                'organizations': event['organizations']
-            })
-    
-    return pd.DataFrame(all_events)
+            doc_ids.append(doc['doc_id'])
+            event_types.append(event['event_type'])
+            keywords.append(event['keyword'])
+    
+    return pd.DataFrame({
+        'doc_id': doc_ids,
+        'event_type': pd.Categorical(event_types),
+        'keyword': pd.Categorical(keywords)
+    })
 
 def create_entity_summary(nlp_results):
     """Crée un résumé des entités détectées"""
-    all_entities = []
+    doc_ids, texts, canonicals, labels = [], [], [], []
     for doc in nlp_results:
         for entity in doc['entities']:
-            all_entities.append({
-                'doc_id': doc['doc_id'],
-                'text': entity['text'],
-                'label': entity['label']
-            })
+            doc_ids.append(doc['doc_id'])
+            texts.append(entity['text'])
+            canonicals.append(entity.get('canonical', entity['text']))
+            labels.append(entity['label'])
     
-    return pd.DataFrame(all_entities)
+    return pd.DataFrame({
+        'doc_id': doc_ids,
+        'text': pd.Categorical(texts),
+        'canonical': pd.Categorical(canonicals),
+        'label': pd.Categorical(labels)
+    })
 
 # Interface principale
 def main():
+    setup_from_env()
     st.title("🌍 OSINT Geopolitical Dashboard")
     st.markdown("**Analyse des tendances géopolitiques** - Think Tank IRIS")
     
@@ -174,8 +242,8 @@ def main():
             st.plotly_chart(fig_entities, use_container_width=True)
         
         with col2:
-            # Top entités mentionnées
-            entity_counts = entities_df['text'].value_counts().head(15)
+            # Top entités mentionnées (formes canoniques)
+            entity_counts = entities_df['canonical'].value_counts().head(15)
             
             fig_top_entities = px.bar(
                 x=entity_counts.values,
@@ -187,6 +255,42 @@ def main():
             fig_top_entities.update_layout(yaxis={'categoryorder': 'total ascending'})
             st.plotly_chart(fig_top_entities, use_container_width=True)
     
+    # Graphe de co-occurrence (précalculé par le pipeline NLP)
+    st.header("🕸️ Qui apparaît avec qui")
+    
+    cooccurrence_df = load_entity_cooccurrence()
+    trends_df = load_entity_trends()
+    
+    if not cooccurrence_df.empty:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Matrice d'adjacence symétrique des paires les plus fréquentes
+            adjacency = pd.concat([
+                cooccurrence_df,
+                cooccurrence_df.rename(columns={'entity_a': 'entity_b', 'entity_b': 'entity_a'})
+            ]).pivot_table(index='entity_a', columns='entity_b', values='weight', fill_value=0)
+            
+            fig_graph = px.imshow(
+                adjacency,
+                title="Co-occurrences entre entités",
+                labels={'x': 'Entité', 'y': 'Entité', 'color': 'Documents'},
+                color_continuous_scale='Blues'
+            )
+            st.plotly_chart(fig_graph, use_container_width=True)
+        
+        with col2:
+            if not trends_df.empty:
+                fig_trends = px.line(
+                    trends_df,
+                    x='window_start',
+                    y='documents',
+                    color='entity',
+                    title="Tendance hebdomadaire des entités principales",
+                    labels={'window_start': 'Semaine', 'documents': 'Documents', 'entity': 'Entité'}
+                )
+                st.plotly_chart(fig_trends, use_container_width=True)
+    
     # Détails des articles
     st.header("📰 Détails des articles")
     
@@ -230,12 +334,15 @@ def main():
             with col1:
                 st.subheader("🚨 Événements détectés")
                 for event in selected_doc['events']:
+                    # Cibles/organisations stockées une fois par document (par événement dans les anciens fichiers)
+                    targets = event.get('targets', selected_doc.get('targets', []))
+                    organizations = event.get('organizations', selected_doc.get('organizations', []))
                     with st.expander(f"{event['event_type']}: {event['keyword']}"):
                         st.write(f"**Contexte:** {event['context']}")
-                        if event['targets']:
-                            st.write(f"**Cibles:** {', '.join(event['targets'])}")
-                        if event['organizations']:
-                            st.write(f"**Organisations:** {', '.join(event['organizations'])}")
+                        if targets:
+                            st.write(f"**Cibles:** {', '.join(targets)}")
+                        if organizations:
+                            st.write(f"**Organisations:** {', '.join(organizations)}")
             
             with col2:
                 st.subheader("🏛️ Entités extraites")
@@ -244,7 +351,7 @@ def main():
                     label = entity['label']
                     if label not in entities_by_type:
                         entities_by_type[label] = []
-                    entities_by_type[label].append(entity['text'])
+                    entities_by_type[label].append(entity.get('canonical', entity['text']))
                 
                 for label, entities in entities_by_type.items():
                     st.write(f"**{label}:** {', '.join(set(entities))}")
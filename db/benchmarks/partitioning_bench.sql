@@ -0,0 +1,114 @@
+-- Benchmark : table plate vs table partitionnée, 1M+ lignes (Postgres local)
+-- Usage (schéma "bench" isolé, supprimé à la fin) :
+--   psql -v ON_ERROR_STOP=1 -v rows=1000000 -f db/partitioning.sql -f db/benchmarks/partitioning_bench.sql
+-- Les requêtes mesurées reprennent celles du dashboard (filtre source + tri date_published).
+
+\if :{?rows}
+\else
+  \set rows 1000000
+\endif
+
+\timing on
+
+DROP SCHEMA IF EXISTS bench CASCADE;
+CREATE SCHEMA bench;
+SET search_path = bench, public;
+
+-- Données synthétiques : 5 sources, ~4 ans de collecte, date_published <= date_collected
+CREATE TABLE bench_rows AS
+SELECT
+  (ARRAY['iris', 'ifri', 'institut_delors', 'brookings', 'unknown'])[1 + (g % 5)] AS source,
+  'https://example.org/article/' || g AS url,
+  'Article ' || g AS title,
+  ts - (random() * INTERVAL '30 days') AS date_published,
+  ts AS date_collected,
+  repeat('lorem ipsum ', 20) AS content_text
+FROM (
+  SELECT g, NOW() - (random() * INTERVAL '4 years') AS ts
+  FROM generate_series(1, :rows) AS g
+) s;
+
+-- Table plate (ancien schéma)
+CREATE TABLE rss_feeds_flat (
+  id SERIAL PRIMARY KEY,
+  source TEXT NOT NULL,
+  url TEXT UNIQUE NOT NULL,
+  title TEXT,
+  date_published TIMESTAMPTZ,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  content_text TEXT
+);
+
+-- Table partitionnée (nouveau schéma) + clé d'URL non partitionnée
+CREATE TABLE rss_feeds_urls (
+  url TEXT PRIMARY KEY,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (url, date_collected)
+);
+CREATE TABLE rss_feeds (
+  id SERIAL,
+  source TEXT NOT NULL,
+  url TEXT NOT NULL,
+  title TEXT,
+  date_published TIMESTAMPTZ,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  content_text TEXT,
+  PRIMARY KEY (id, date_collected),
+  UNIQUE (url, date_collected),
+  FOREIGN KEY (url, date_collected) REFERENCES rss_feeds_urls (url, date_collected)
+) PARTITION BY RANGE (date_collected);
+CREATE TABLE rss_feeds_default PARTITION OF rss_feeds DEFAULT;
+CREATE INDEX rss_feeds_source_date_published_idx ON rss_feeds (source, date_published DESC);
+SELECT create_monthly_partitions('rss_feeds', (NOW() - INTERVAL '4 years')::date, CURRENT_DATE);
+
+\echo '== Chargement'
+INSERT INTO rss_feeds_flat (source, url, title, date_published, date_collected, content_text)
+SELECT source, url, title, date_published, date_collected, content_text FROM bench_rows;
+INSERT INTO rss_feeds_urls (url, date_collected)
+SELECT url, date_collected FROM bench_rows;
+INSERT INTO rss_feeds (source, url, title, date_published, date_collected, content_text)
+SELECT source, url, title, date_published, date_collected, content_text FROM bench_rows;
+ANALYZE rss_feeds_flat;
+ANALYZE rss_feeds_urls;
+ANALYZE rss_feeds;
+
+\echo '== Requête dashboard (source + tri date_published) : table plate'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, title, url, date_published, date_collected, source
+FROM rss_feeds_flat WHERE source = 'iris' ORDER BY date_published DESC LIMIT 100;
+
+\echo '== Requête dashboard (source + tri date_published) : table partitionnée'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, title, url, date_published, date_collected, source
+FROM rss_feeds WHERE source = 'iris' ORDER BY date_published DESC LIMIT 100;
+
+\echo '== Fenêtre de collecte récente (élagage de partitions) : table plate'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT source, COUNT(*) FROM rss_feeds_flat
+WHERE date_collected >= NOW() - INTERVAL '30 days' GROUP BY source;
+
+\echo '== Fenêtre de collecte récente (élagage de partitions) : table partitionnée'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT source, COUNT(*) FROM rss_feeds
+WHERE date_collected >= NOW() - INTERVAL '30 days' GROUP BY source;
+
+\echo '== Upsert d''une URL existante (chemin des pipelines) : table partitionnée'
+EXPLAIN (ANALYZE, BUFFERS)
+WITH url_key AS (
+  INSERT INTO rss_feeds_urls (url) VALUES ('https://example.org/article/42')
+  ON CONFLICT (url) DO UPDATE SET url = EXCLUDED.url
+  RETURNING date_collected
+)
+INSERT INTO rss_feeds (source, url, title, date_collected)
+VALUES ('iris', 'https://example.org/article/42', 'Article 42 (maj)', (SELECT date_collected FROM url_key))
+ON CONFLICT (url, date_collected) DO UPDATE SET title = EXCLUDED.title;
+
+\echo '== Rétention 3 ans : DELETE sur table plate'
+DELETE FROM rss_feeds_flat WHERE date_collected < date_trunc('month', NOW() - INTERVAL '3 years');
+
+\echo '== Rétention 3 ans : DROP des partitions'
+SELECT COUNT(*) AS partitions_dropped FROM drop_partitions_older_than('rss_feeds', INTERVAL '3 years');
+
+\timing off
+RESET search_path;
+DROP SCHEMA bench CASCADE;
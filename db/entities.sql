@@ -0,0 +1,59 @@
+-- Normalisation des entités et graphe de co-occurrence précalculé
+-- Indépendant du partitionnement : peut être appliqué tel quel sur une base existante.
+
+-- Alias -> nom canonique (la comparaison ignore casse, accents et article initial)
+CREATE TABLE IF NOT EXISTS entity_aliases (
+  alias TEXT PRIMARY KEY,
+  canonical TEXT NOT NULL
+);
+
+INSERT INTO entity_aliases (alias, canonical) VALUES
+  ('Russie', 'Russia'),
+  ('Fédération de Russie', 'Russia'),
+  ('Russian Federation', 'Russia'),
+  ('Chine', 'China'),
+  ('République populaire de Chine', 'China'),
+  ('États-Unis', 'United States'),
+  ('Etats-Unis', 'United States'),
+  ('US', 'United States'),
+  ('U.S.', 'United States'),
+  ('USA', 'United States'),
+  ('Allemagne', 'Germany'),
+  ('Royaume-Uni', 'United Kingdom'),
+  ('UK', 'United Kingdom'),
+  ('Israël', 'Israel'),
+  ('Union européenne', 'European Union'),
+  ('UE', 'European Union'),
+  ('EU', 'European Union'),
+  ('OTAN', 'NATO'),
+  ('ONU', 'United Nations'),
+  ('Nations unies', 'United Nations'),
+  ('UN', 'United Nations')
+ON CONFLICT (alias) DO NOTHING;
+
+-- Entités canoniques par document (une ligne par couple document/entité)
+CREATE TABLE IF NOT EXISTS entity_documents (
+  doc_id INTEGER NOT NULL,
+  entity TEXT NOT NULL,
+  label TEXT,
+  window_start DATE NOT NULL,
+  mentions INTEGER NOT NULL DEFAULT 1,
+  PRIMARY KEY (doc_id, entity)
+);
+
+CREATE INDEX IF NOT EXISTS entity_documents_window_entity_idx
+  ON entity_documents (window_start, entity);
+
+-- Adjacence creuse : nombre de documents d'une fenêtre hebdomadaire où deux entités apparaissent ensemble.
+-- Collation "C" pour que entity_a < entity_b suive le même ordre que le tri des paires en Python.
+CREATE TABLE IF NOT EXISTS entity_cooccurrence (
+  window_start DATE NOT NULL,
+  entity_a TEXT COLLATE "C" NOT NULL,
+  entity_b TEXT COLLATE "C" NOT NULL,
+  doc_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (window_start, entity_a, entity_b),
+  CHECK (entity_a < entity_b)
+);
+
+CREATE INDEX IF NOT EXISTS entity_cooccurrence_a_idx ON entity_cooccurrence (entity_a);
+CREATE INDEX IF NOT EXISTS entity_cooccurrence_b_idx ON entity_cooccurrence (entity_b);
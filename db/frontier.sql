@@ -0,0 +1,24 @@
+-- Frontière de crawl persistante (reprise des crawls interrompus + revisites adaptatives)
+CREATE TABLE IF NOT EXISTS crawl_frontier (
+  url TEXT PRIMARY KEY,
+  spider TEXT NOT NULL,
+  domain TEXT NOT NULL,
+  kind TEXT NOT NULL,                 -- sitemap_index, sitemap, feed, article
+  priority INTEGER NOT NULL DEFAULT 0,
+  status TEXT NOT NULL DEFAULT 'pending',  -- pending, done, failed
+  meta JSONB,                         -- meta Scrapy nécessaire au callback (reprise)
+  fetch_count INTEGER NOT NULL DEFAULT 0,
+  change_count INTEGER NOT NULL DEFAULT 0,
+  error_count INTEGER NOT NULL DEFAULT 0,       -- échecs consécutifs (abandon au-delà de FRONTIER_MAX_FAILURES)
+  revisit_interval INTERVAL NOT NULL DEFAULT INTERVAL '1 day',
+  content_hash TEXT,
+  lastmod TIMESTAMPTZ,
+  last_error TEXT,
+  date_added TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_crawled TIMESTAMPTZ,
+  next_crawl_at TIMESTAMPTZ DEFAULT NOW()  -- NULL : ne plus revisiter
+);
+
+CREATE INDEX IF NOT EXISTS crawl_frontier_due_idx
+  ON crawl_frontier (spider, next_crawl_at)
+  WHERE next_crawl_at IS NOT NULL;
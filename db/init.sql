@@ -1,7 +1,15 @@
+-- Clé d'unicité des URLs (table non partitionnée) : une URL -> une date_collected,
+-- donc une seule ligne dans documents ; sert aussi à l'upsert sans parcourir les partitions
+CREATE TABLE IF NOT EXISTS documents_urls (
+  url TEXT PRIMARY KEY,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (url, date_collected)
+);
+
 CREATE TABLE IF NOT EXISTS documents (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   source TEXT NOT NULL,
-  url TEXT UNIQUE NOT NULL,
+  url TEXT NOT NULL,
   title TEXT,
   date_published TIMESTAMPTZ,
   date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
@@ -12,13 +20,29 @@ CREATE TABLE IF NOT EXISTS documents (
   content_hash TEXT,
   tags TEXT[],
   entities JSONB,
-  embedding BYTEA
+  embedding BYTEA,
+  PRIMARY KEY (id, date_collected),
+  UNIQUE (url, date_collected),
+  FOREIGN KEY (url, date_collected) REFERENCES documents_urls (url, date_collected)
+) PARTITION BY RANGE (date_collected);
+
+CREATE TABLE IF NOT EXISTS documents_default PARTITION OF documents DEFAULT;
+
+CREATE INDEX IF NOT EXISTS documents_source_date_published_idx
+  ON documents (source, date_published DESC);
+
+-- Clé d'unicité des URLs (table non partitionnée) : une URL -> une date_collected,
+-- donc une seule ligne dans rss_feeds ; sert aussi à l'upsert sans parcourir les partitions
+CREATE TABLE IF NOT EXISTS rss_feeds_urls (
+  url TEXT PRIMARY KEY,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (url, date_collected)
 );
 
 CREATE TABLE IF NOT EXISTS rss_feeds (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   source TEXT NOT NULL,
-  url TEXT UNIQUE NOT NULL,
+  url TEXT NOT NULL,
   title TEXT,
   description TEXT,
   date_published TIMESTAMPTZ,
@@ -28,5 +52,17 @@ CREATE TABLE IF NOT EXISTS rss_feeds (
   guid TEXT,
   content_text TEXT,
   content_hash TEXT,
-  rss_feed_url TEXT
-);
+  rss_feed_url TEXT,
+  PRIMARY KEY (id, date_collected),
+  UNIQUE (url, date_collected),
+  FOREIGN KEY (url, date_collected) REFERENCES rss_feeds_urls (url, date_collected)
+) PARTITION BY RANGE (date_collected);
+
+CREATE TABLE IF NOT EXISTS rss_feeds_default PARTITION OF rss_feeds DEFAULT;
+
+CREATE INDEX IF NOT EXISTS rss_feeds_source_date_published_idx
+  ON rss_feeds (source, date_published DESC);
+
+-- Partitions du mois courant + 2 mois d'avance (les pipelines les prolongent à chaque crawl)
+SELECT create_monthly_partitions('documents', CURRENT_DATE, (CURRENT_DATE + INTERVAL '2 months')::date);
+SELECT create_monthly_partitions('rss_feeds', CURRENT_DATE, (CURRENT_DATE + INTERVAL '2 months')::date);
@@ -0,0 +1,114 @@
+-- Migration : tables plates documents / rss_feeds -> tables partitionnées par mois
+-- A appliquer sur une base créée avec l'ancien init.sql (après db/partitioning.sql) :
+--   psql -v ON_ERROR_STOP=1 -f db/partitioning.sql -f db/migrations/001_partition_documents_rss_feeds.sql
+-- Les identifiants et séquences existants sont conservés.
+
+BEGIN;
+
+-- documents
+ALTER TABLE documents RENAME TO documents_flat;
+ALTER TABLE documents_flat RENAME CONSTRAINT documents_pkey TO documents_flat_pkey;
+ALTER TABLE documents_flat RENAME CONSTRAINT documents_url_key TO documents_flat_url_key;
+
+CREATE TABLE documents_urls (
+  url TEXT PRIMARY KEY,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (url, date_collected)
+);
+
+INSERT INTO documents_urls (url, date_collected)
+SELECT url, date_collected FROM documents_flat;
+
+CREATE TABLE documents (
+  id INTEGER NOT NULL DEFAULT nextval('documents_id_seq'),
+  source TEXT NOT NULL,
+  url TEXT NOT NULL,
+  title TEXT,
+  date_published TIMESTAMPTZ,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  authors TEXT[],
+  language TEXT,
+  section TEXT,
+  content_text TEXT,
+  content_hash TEXT,
+  tags TEXT[],
+  entities JSONB,
+  embedding BYTEA,
+  PRIMARY KEY (id, date_collected),
+  UNIQUE (url, date_collected),
+  FOREIGN KEY (url, date_collected) REFERENCES documents_urls (url, date_collected)
+) PARTITION BY RANGE (date_collected);
+
+CREATE TABLE documents_default PARTITION OF documents DEFAULT;
+CREATE INDEX documents_source_date_published_idx ON documents (source, date_published DESC);
+
+SELECT create_monthly_partitions(
+  'documents',
+  COALESCE((SELECT MIN(date_collected) FROM documents_flat)::date, CURRENT_DATE),
+  (CURRENT_DATE + INTERVAL '2 months')::date
+);
+
+INSERT INTO documents (id, source, url, title, date_published, date_collected, authors, language,
+                       section, content_text, content_hash, tags, entities, embedding)
+SELECT id, source, url, title, date_published, date_collected, authors, language,
+       section, content_text, content_hash, tags, entities, embedding
+FROM documents_flat;
+
+ALTER SEQUENCE documents_id_seq OWNED BY documents.id;
+DROP TABLE documents_flat;
+
+-- rss_feeds
+ALTER TABLE rss_feeds RENAME TO rss_feeds_flat;
+ALTER TABLE rss_feeds_flat RENAME CONSTRAINT rss_feeds_pkey TO rss_feeds_flat_pkey;
+ALTER TABLE rss_feeds_flat RENAME CONSTRAINT rss_feeds_url_key TO rss_feeds_flat_url_key;
+
+CREATE TABLE rss_feeds_urls (
+  url TEXT PRIMARY KEY,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (url, date_collected)
+);
+
+INSERT INTO rss_feeds_urls (url, date_collected)
+SELECT url, date_collected FROM rss_feeds_flat;
+
+CREATE TABLE rss_feeds (
+  id INTEGER NOT NULL DEFAULT nextval('rss_feeds_id_seq'),
+  source TEXT NOT NULL,
+  url TEXT NOT NULL,
+  title TEXT,
+  description TEXT,
+  date_published TIMESTAMPTZ,
+  date_collected TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  author TEXT,
+  categories TEXT[],
+  guid TEXT,
+  content_text TEXT,
+  content_hash TEXT,
+  rss_feed_url TEXT,
+  PRIMARY KEY (id, date_collected),
+  UNIQUE (url, date_collected),
+  FOREIGN KEY (url, date_collected) REFERENCES rss_feeds_urls (url, date_collected)
+) PARTITION BY RANGE (date_collected);
+
+CREATE TABLE rss_feeds_default PARTITION OF rss_feeds DEFAULT;
+CREATE INDEX rss_feeds_source_date_published_idx ON rss_feeds (source, date_published DESC);
+
+SELECT create_monthly_partitions(
+  'rss_feeds',
+  COALESCE((SELECT MIN(date_collected) FROM rss_feeds_flat)::date, CURRENT_DATE),
+  (CURRENT_DATE + INTERVAL '2 months')::date
+);
+
+INSERT INTO rss_feeds (id, source, url, title, description, date_published, date_collected, author,
+                       categories, guid, content_text, content_hash, rss_feed_url)
+SELECT id, source, url, title, description, date_published, date_collected, author,
+       categories, guid, content_text, content_hash, rss_feed_url
+FROM rss_feeds_flat;
+
+ALTER SEQUENCE rss_feeds_id_seq OWNED BY rss_feeds.id;
+DROP TABLE rss_feeds_flat;
+
+COMMIT;
+
+ANALYZE documents;
+ANALYZE rss_feeds;
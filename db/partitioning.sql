@@ -0,0 +1,62 @@
+-- Gestion des partitions mensuelles (documents, rss_feeds)
+-- Les tables sont partitionnées par RANGE sur date_collected : la colonne est
+-- NOT NULL et n'est jamais modifiée par les upserts, contrairement à
+-- date_published qui peut être absente ou corrigée d'un crawl à l'autre.
+
+-- Crée les partitions mensuelles manquantes entre start_month et end_month (inclus)
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, start_month DATE, end_month DATE)
+RETURNS INTEGER AS $$
+DECLARE
+  month_start DATE := date_trunc('month', start_month)::date;
+  created INTEGER := 0;
+BEGIN
+  WHILE month_start <= end_month LOOP
+    IF to_regclass(parent || '_' || to_char(month_start, 'YYYY_MM')) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+        parent || '_' || to_char(month_start, 'YYYY_MM'),
+        parent,
+        month_start,
+        (month_start + INTERVAL '1 month')::date
+      );
+      created := created + 1;
+    END IF;
+    month_start := (month_start + INTERVAL '1 month')::date;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rétention : supprime les partitions entièrement antérieures à now() - retention.
+-- Un DROP TABLE sur une partition évite le DELETE massif + VACUUM.
+-- Les clés d'URL correspondantes (table <parent>_urls) sont purgées ensuite.
+CREATE OR REPLACE FUNCTION drop_partitions_older_than(parent TEXT, retention INTERVAL)
+RETURNS SETOF TEXT AS $$
+DECLARE
+  cutoff DATE := date_trunc('month', now() - retention)::date;
+  child RECORD;
+BEGIN
+  FOR child IN
+    SELECT n.nspname, c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE i.inhparent = parent::regclass
+      AND c.relname ~ ('^' || parent || '_\d{4}_\d{2}$')
+    ORDER BY c.relname
+  LOOP
+    IF to_date(right(child.relname, 7), 'YYYY_MM') < cutoff THEN
+      EXECUTE format('DROP TABLE %I.%I', child.nspname, child.relname);
+      RETURN NEXT child.relname;
+    END IF;
+  END LOOP;
+
+  IF to_regclass(parent || '_urls') IS NOT NULL THEN
+    EXECUTE format(
+      'DELETE FROM %I k WHERE k.date_collected < %L
+         AND NOT EXISTS (SELECT 1 FROM %I p WHERE p.url = k.url AND p.date_collected = k.date_collected)',
+      parent || '_urls', cutoff, parent
+    );
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
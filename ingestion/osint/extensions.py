@@ -0,0 +1,24 @@
+from scrapy import signals
+from scrapy.extensions.throttle import AutoThrottle
+
+
+class FloorAutoThrottle(AutoThrottle):
+    """AutoThrottle qui ne descend jamais sous le délai plancher d'un domaine.
+
+    Le plancher est le délai du slot dans DOWNLOAD_SLOTS, relevé au Crawl-delay
+    de robots.txt par CrawlDelayRobotsTxtMiddleware.
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        # Connecté après le handler d'AutoThrottle : le plancher est rétabli juste
+        # après son ajustement, avant que le downloader ne relance la file du slot
+        crawler.signals.connect(self._enforce_floor, signal=signals.response_downloaded)
+
+    def _enforce_floor(self, response, request, spider):
+        downloader = self.crawler.engine.downloader
+        key = request.meta.get("download_slot")
+        slot = downloader.slots.get(key)
+        floor = float(downloader.per_slot_settings.get(key, {}).get("delay", 0.0))
+        if slot is not None and slot.delay < floor:
+            slot.delay = floor
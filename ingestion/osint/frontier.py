@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+from datetime import timedelta
+from urllib.parse import urlparse
+
+import psycopg2
+import scrapy
+from scrapy import signals
+from dateutil import parser as date_parser
+from scrapy.spidermiddlewares.httperror import HttpError
+
+# Pages listant des articles : revisitées selon leur fréquence de mise à jour observée
+REVISIT_KINDS = ("sitemap_index", "sitemap", "feed")
+
+# Statuts HTTP définitifs : l'URL n'est plus retentée
+GONE_STATUSES = (404, 410)
+
+
+def next_revisit(interval, changed, min_interval, max_interval):
+    """Intervalle de revisite adaptatif : divisé par 2 si la page a changé, x1.5 sinon"""
+    interval = interval / 2 if changed else interval * 1.5
+    return min(max(interval, min_interval), max_interval)
+
+
+def revisit_priority(change_count, fetch_count):
+    """Priorité 0-100 selon le taux de changement observé (lissage de Laplace)"""
+    return int(100 * (change_count + 1) / (fetch_count + 2))
+
+
+class CrawlFrontier:
+    """Frontière de crawl stockée dans Postgres (table crawl_frontier)"""
+
+    def __init__(self, conn, spider_name, settings):
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.spider_name = spider_name
+        self.min_revisit = timedelta(seconds=settings.getint("FRONTIER_MIN_REVISIT", 900))
+        self.max_revisit = timedelta(seconds=settings.getint("FRONTIER_MAX_REVISIT", 7 * 86400))
+        self.default_revisit = timedelta(seconds=settings.getint("FRONTIER_DEFAULT_REVISIT", 86400))
+        self.batch_size = settings.getint("FRONTIER_BATCH_SIZE", 5000)
+        self.max_failures = settings.getint("FRONTIER_MAX_FAILURES", 5)
+
+    @classmethod
+    def connect(cls, spider_name, settings):
+        conn = psycopg2.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            port=int(os.getenv("DB_PORT", "5432")),
+            dbname=os.getenv("DB_NAME", "geopolitics"),
+            user=os.getenv("DB_USER", "osint"),
+            password=os.getenv("DB_PASSWORD", "secret"),
+        )
+        conn.autocommit = True
+        return cls(conn, spider_name, settings)
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+    def add(self, url, kind, priority=0, meta=None, lastmod=None):
+        """Ajoute une URL à la frontière. Renvoie True si elle est à crawler maintenant.
+
+        Une URL déjà crawlée redevient à faire si son lastmod (sitemap) est
+        postérieur au dernier passage.
+        """
+        try:
+            lastmod = date_parser.isoparse(lastmod) if lastmod else None
+        except ValueError:
+            lastmod = None
+
+        self.cur.execute(
+            '''
+            INSERT INTO crawl_frontier (url, spider, domain, kind, priority, meta, revisit_interval, lastmod)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (url) DO UPDATE SET
+              lastmod = COALESCE(EXCLUDED.lastmod, crawl_frontier.lastmod),
+              status = CASE WHEN EXCLUDED.lastmod > crawl_frontier.last_crawled
+                            THEN 'pending' ELSE crawl_frontier.status END,
+              next_crawl_at = CASE WHEN EXCLUDED.lastmod > crawl_frontier.last_crawled
+                                   THEN NOW() ELSE crawl_frontier.next_crawl_at END,
+              meta = COALESCE(EXCLUDED.meta, crawl_frontier.meta)
+            RETURNING status = 'pending' AND next_crawl_at <= NOW();
+            ''',
+            (
+                url,
+                self.spider_name,
+                urlparse(url).hostname or "",
+                kind,
+                priority,
+                json.dumps(meta) if meta else None,
+                self.default_revisit,
+                lastmod,
+            ),
+        )
+        return self.cur.fetchone()[0]
+
+    def seed(self, url, kind, priority=100):
+        """Ajoute une URL de départ du spider, et la relance si elle était abandonnée"""
+        self.cur.execute(
+            '''
+            INSERT INTO crawl_frontier (url, spider, domain, kind, priority, revisit_interval)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (url) DO UPDATE SET
+              status = CASE WHEN crawl_frontier.next_crawl_at IS NULL
+                            THEN 'pending' ELSE crawl_frontier.status END,
+              error_count = CASE WHEN crawl_frontier.next_crawl_at IS NULL
+                                 THEN 0 ELSE crawl_frontier.error_count END,
+              next_crawl_at = COALESCE(crawl_frontier.next_crawl_at, NOW());
+            ''',
+            (url, self.spider_name, urlparse(url).hostname or "", kind, priority, self.default_revisit),
+        )
+
+    def due(self):
+        """URLs dont la (re)visite est due, par priorité décroissante"""
+        self.cur.execute(
+            '''
+            SELECT url, kind, priority, meta
+            FROM crawl_frontier
+            WHERE spider = %s AND next_crawl_at <= NOW()
+            ORDER BY priority DESC, next_crawl_at
+            LIMIT %s;
+            ''',
+            (self.spider_name, self.batch_size),
+        )
+        return self.cur.fetchall()
+
+    def mark_fetched(self, url, body):
+        """Enregistre un passage réussi et planifie la prochaine visite"""
+        content_hash = hashlib.sha256(body).hexdigest()
+        self.cur.execute(
+            "SELECT kind, content_hash, revisit_interval, fetch_count, change_count FROM crawl_frontier WHERE url = %s;",
+            (url,),
+        )
+        row = self.cur.fetchone()
+        if row is None:
+            return
+        kind, previous_hash, interval, fetch_count, change_count = row
+
+        changed = previous_hash is not None and previous_hash != content_hash
+        fetch_count += 1
+        change_count += int(changed)
+        if kind in REVISIT_KINDS:
+            # Premier passage : on garde l'intervalle par défaut
+            if previous_hash is not None:
+                interval = next_revisit(interval, changed, self.min_revisit, self.max_revisit)
+            priority = revisit_priority(change_count, fetch_count)
+            next_crawl = "NOW() + %(interval)s"
+        else:
+            priority = None
+            next_crawl = "NULL"
+
+        self.cur.execute(
+            f'''
+            UPDATE crawl_frontier SET
+              status = 'done',
+              content_hash = %(content_hash)s,
+              fetch_count = %(fetch_count)s,
+              change_count = %(change_count)s,
+              revisit_interval = %(interval)s,
+              priority = COALESCE(%(priority)s, priority),
+              error_count = 0,
+              last_error = NULL,
+              last_crawled = NOW(),
+              next_crawl_at = {next_crawl}
+            WHERE url = %(url)s;
+            ''',
+            {
+                "content_hash": content_hash,
+                "fetch_count": fetch_count,
+                "change_count": change_count,
+                "interval": interval,
+                "priority": priority,
+                "url": url,
+            },
+        )
+
+    def mark_failed(self, url, error, gone=False):
+        """Échec : nouvelle tentative avec un intervalle doublé à chaque échec.
+
+        Un article est abandonné (next_crawl_at NULL) après FRONTIER_MAX_FAILURES
+        échecs consécutifs, ou immédiatement si gone=True (404/410). Les pages de
+        revisite (flux, sitemaps) ne sont jamais abandonnées : l'intervalle
+        plafonne à FRONTIER_MAX_REVISIT.
+        """
+        self.cur.execute(
+            '''
+            UPDATE crawl_frontier SET
+              status = 'failed',
+              fetch_count = fetch_count + 1,
+              error_count = error_count + 1,
+              last_error = %(error)s,
+              revisit_interval = LEAST(revisit_interval * 2, %(max_revisit)s),
+              next_crawl_at = CASE
+                WHEN kind <> ALL(%(revisit_kinds)s)
+                     AND (%(gone)s OR error_count + 1 >= %(max_failures)s) THEN NULL
+                ELSE NOW() + LEAST(revisit_interval * 2, %(max_revisit)s)
+              END
+            WHERE url = %(url)s;
+            ''',
+            {
+                "error": error,
+                "max_revisit": self.max_revisit,
+                "gone": gone,
+                "max_failures": self.max_failures,
+                "revisit_kinds": list(REVISIT_KINDS),
+                "url": url,
+            },
+        )
+
+
+class FrontierMixin:
+    """Spider Scrapy alimenté par la frontière persistante.
+
+    Le spider déclare `frontier_callbacks` (kind -> nom de méthode) et
+    `frontier_seed_kind` pour ses start_urls. Les flux et sitemaps sont marqués
+    faits par leur callback (mark_fetched) ; un article ne l'est qu'une fois son
+    item stocké par le pipeline (signal item_scraped).
+    """
+
+    frontier_seed_kind = "feed"
+    frontier_callbacks = {}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.frontier_item_scraped, signal=signals.item_scraped)
+        return spider
+
+    def start_requests(self):
+        self.frontier = CrawlFrontier.connect(self.name, self.settings)
+        # URLs déjà planifiées pendant ce run : dont_filter contourne le filtre de
+        # doublons de Scrapy pour les revisites, on déduplique donc ici
+        self.frontier_scheduled = set()
+        for url in self.start_urls:
+            self.frontier.seed(url, self.frontier_seed_kind)
+        # Reprend les URLs en attente (crawl interrompu) et les revisites échues
+        for url, kind, priority, meta in self.frontier.due():
+            yield self.frontier_request(url, kind, priority, meta or {})
+
+    def frontier_request(self, url, kind, priority=0, meta=None):
+        self.frontier_scheduled.add(url)
+        return scrapy.Request(
+            url,
+            callback=getattr(self, self.frontier_callbacks[kind]),
+            errback=self.frontier_failed,
+            priority=priority,
+            meta={**(meta or {}), "frontier_url": url, "frontier_kind": kind},
+            # Les pages revisitées doivent passer le filtre de doublons
+            dont_filter=kind in REVISIT_KINDS,
+        )
+
+    def follow_frontier(self, url, kind, priority=0, meta=None, lastmod=None):
+        """Ajoute une URL découverte et renvoie la requête si elle est à crawler"""
+        if url in self.frontier_scheduled:
+            return None
+        if self.frontier.add(url, kind, priority, meta, lastmod):
+            return self.frontier_request(url, kind, priority, meta)
+        return None
+
+    def mark_fetched(self, response):
+        self.frontier.mark_fetched(response.meta.get("frontier_url", response.url), response.body)
+
+    def frontier_item_scraped(self, item, response, spider):
+        # Article stocké : on peut le retirer de la frontière. S'il échoue dans le
+        # pipeline, il reste en attente et sera repris au prochain run
+        if response.meta.get("frontier_kind") == "article":
+            self.mark_fetched(response)
+
+    def frontier_failed(self, failure):
+        request = failure.request
+        gone = failure.check(HttpError) is not None and failure.value.response.status in GONE_STATUSES
+        self.logger.warning(f"Échec du crawl de {request.url}: {failure.value!r}")
+        self.frontier.mark_failed(request.meta.get("frontier_url", request.url), repr(failure.value), gone=gone)
+
+    def closed(self, reason):
+        if hasattr(self, "frontier"):
+            self.frontier.close()
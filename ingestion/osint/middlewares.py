@@ -0,0 +1,43 @@
+from scrapy.downloadermiddlewares.robotstxt import RobotsTxtMiddleware
+from scrapy.utils.httpobj import urlparse_cached
+
+
+class CrawlDelayRobotsTxtMiddleware(RobotsTxtMiddleware):
+    """RobotsTxtMiddleware qui applique aussi le Crawl-delay de robots.txt.
+
+    Le Crawl-delay relève le délai du domaine dans les réglages par slot du
+    downloader (DOWNLOAD_SLOTS) : il vaut pour les slots créés ensuite et sert
+    de plancher à FloorAutoThrottle (osint.extensions).
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        self._crawl_delays = {}
+
+    def process_request_2(self, rp, request, spider):
+        super().process_request_2(rp, request, spider)
+        if rp is None or not hasattr(rp, "rp"):
+            return
+
+        hostname = urlparse_cached(request).hostname
+        if hostname in self._crawl_delays:
+            return
+
+        useragent = self._robotstxt_useragent or request.headers.get(b"User-Agent", self._default_useragent)
+        if isinstance(useragent, bytes):
+            useragent = useragent.decode("utf-8", "ignore")
+        # Protego (parser par défaut de Scrapy) expose crawl_delay()
+        delay = rp.rp.crawl_delay(useragent)
+        self._crawl_delays[hostname] = float(delay) if delay else 0.0
+        if not delay:
+            return
+
+        spider.logger.info(f"robots.txt Crawl-delay {delay}s pour {hostname}")
+        downloader = self.crawler.engine.downloader
+        key = request.meta.get("download_slot") or hostname
+        slot_settings = downloader.per_slot_settings.get(key, {})
+        floor = max(float(slot_settings.get("delay", 0.0)), float(delay))
+        downloader.per_slot_settings[key] = {**slot_settings, "delay": floor}
+        slot = downloader.slots.get(key)
+        if slot is not None and slot.delay < floor:
+            slot.delay = floor
@@ -1,8 +1,10 @@
 import os
 import psycopg2
+from common.metrics import flush, inc, setup_from_env, timed
 
 class PostgresPipeline:
     def open_spider(self, spider):
+        setup_from_env()
         self.conn = psycopg2.connect(
             host=os.getenv("DB_HOST", "localhost"),
             port=int(os.getenv("DB_PORT", "5432")),
@@ -12,36 +14,53 @@ class PostgresPipeline:
         )
         self.conn.autocommit = True
         self.cur = self.conn.cursor()
+        # Partitions mensuelles (mois courant + 2 mois d'avance) avant d'insérer
+        self.cur.execute(
+            "SELECT create_monthly_partitions(%s, CURRENT_DATE, (CURRENT_DATE + INTERVAL '2 months')::date);",
+            ("documents",),
+        )
 
     def close_spider(self, spider):
         self.cur.close()
         self.conn.close()
+        flush()
 
     def process_item(self, item, spider):
-        self.cur.execute(
-            '''
-            INSERT INTO documents (source, url, title, date_published, content_text, content_hash)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO UPDATE SET
-              title = EXCLUDED.title,
-              date_published = EXCLUDED.date_published,
-              content_text = EXCLUDED.content_text,
-              content_hash = EXCLUDED.content_hash;
-            ''',
-            (
-                item.get("source"),
-                item.get("url"),
-                item.get("title"),
-                item.get("date_published"),
-                item.get("content_text"),
-                item.get("content_hash"),
-            ),
-        )
+        # La clé d'URL (table non partitionnée) fixe le date_collected de la première
+        # collecte : l'upsert retombe sur la même partition et la même ligne
+        with timed("db_query_seconds", table="documents", operation="upsert"):
+            self.cur.execute(
+                '''
+                WITH url_key AS (
+                  INSERT INTO documents_urls (url) VALUES (%s)
+                  ON CONFLICT (url) DO UPDATE SET url = EXCLUDED.url
+                  RETURNING date_collected
+                )
+                INSERT INTO documents (source, url, title, date_published, content_text, content_hash, date_collected)
+                VALUES (%s, %s, %s, %s, %s, %s, (SELECT date_collected FROM url_key))
+                ON CONFLICT (url, date_collected) DO UPDATE SET
+                  title = EXCLUDED.title,
+                  date_published = EXCLUDED.date_published,
+                  content_text = EXCLUDED.content_text,
+                  content_hash = EXCLUDED.content_hash;
+                ''',
+                (
+                    item.get("url"),
+                    item.get("source"),
+                    item.get("url"),
+                    item.get("title"),
+                    item.get("date_published"),
+                    item.get("content_text"),
+                    item.get("content_hash"),
+                ),
+            )
+        inc("items_stored_total", table="documents")
         return item
 
 
 class RSSPipeline:
     def open_spider(self, spider):
+        setup_from_env()
         self.conn = psycopg2.connect(
             host=os.getenv("DB_HOST", "localhost"),
             port=int(os.getenv("DB_PORT", "5432")),
@@ -51,37 +70,53 @@ class RSSPipeline:
         )
         self.conn.autocommit = True
         self.cur = self.conn.cursor()
+        # Partitions mensuelles (mois courant + 2 mois d'avance) avant d'insérer
+        self.cur.execute(
+            "SELECT create_monthly_partitions(%s, CURRENT_DATE, (CURRENT_DATE + INTERVAL '2 months')::date);",
+            ("rss_feeds",),
+        )
 
     def close_spider(self, spider):
         self.cur.close()
         self.conn.close()
+        flush()
 
     def process_item(self, item, spider):
-        self.cur.execute(
-            '''
-            INSERT INTO rss_feeds (source, url, title, description, date_published, author, categories, guid, content_text, content_hash, rss_feed_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO UPDATE SET
-              title = EXCLUDED.title,
-              description = EXCLUDED.description,
-              date_published = EXCLUDED.date_published,
-              author = EXCLUDED.author,
-              categories = EXCLUDED.categories,
-              content_text = EXCLUDED.content_text,
-              content_hash = EXCLUDED.content_hash;
-            ''',
-            (
-                item.get("source"),
-                item.get("url"),
-                item.get("title"),
-                item.get("description"),
-                item.get("date_published"),
-                item.get("author"),
-                item.get("categories"),
-                item.get("guid"),
-                item.get("content_text"),
-                item.get("content_hash"),
-                item.get("rss_feed_url"),
-            ),
-        )
+        # La clé d'URL (table non partitionnée) fixe le date_collected de la première
+        # collecte : l'upsert retombe sur la même partition et la même ligne
+        with timed("db_query_seconds", table="rss_feeds", operation="upsert"):
+            self.cur.execute(
+                '''
+                WITH url_key AS (
+                  INSERT INTO rss_feeds_urls (url) VALUES (%s)
+                  ON CONFLICT (url) DO UPDATE SET url = EXCLUDED.url
+                  RETURNING date_collected
+                )
+                INSERT INTO rss_feeds (source, url, title, description, date_published, author, categories, guid, content_text, content_hash, rss_feed_url, date_collected)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, (SELECT date_collected FROM url_key))
+                ON CONFLICT (url, date_collected) DO UPDATE SET
+                  title = EXCLUDED.title,
+                  description = EXCLUDED.description,
+                  date_published = EXCLUDED.date_published,
+                  author = EXCLUDED.author,
+                  categories = EXCLUDED.categories,
+                  content_text = EXCLUDED.content_text,
+                  content_hash = EXCLUDED.content_hash;
+                ''',
+                (
+                    item.get("url"),
+                    item.get("source"),
+                    item.get("url"),
+                    item.get("title"),
+                    item.get("description"),
+                    item.get("date_published"),
+                    item.get("author"),
+                    item.get("categories"),
+                    item.get("guid"),
+                    item.get("content_text"),
+                    item.get("content_hash"),
+                    item.get("rss_feed_url"),
+                ),
+            )
+        inc("items_stored_total", table="rss_feeds")
         return item
@@ -10,6 +10,35 @@ AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 1.0
 AUTOTHROTTLE_MAX_DELAY = 10.0
 CONCURRENT_REQUESTS = 4
+CONCURRENT_REQUESTS_PER_DOMAIN = 2
+
+# Budgets de politesse par domaine (slot de téléchargement = hostname).
+# Le délai sert de plancher (AutoThrottle ne descend pas en dessous, osint.extensions),
+# relevé au Crawl-delay de robots.txt s'il est plus grand (osint.middlewares).
+DOWNLOAD_SLOTS = {
+    "www.brookings.edu": {"concurrency": 2, "delay": 1.5},
+    "www.iris-france.org": {"concurrency": 1, "delay": 1.5},
+    "www.ifri.org": {"concurrency": 1, "delay": 2.0},
+    "institutdelors.eu": {"concurrency": 1, "delay": 2.0},
+}
+
+EXTENSIONS = {
+    "scrapy.extensions.throttle.AutoThrottle": None,
+    "osint.extensions.FloorAutoThrottle": 0,
+}
+
+DOWNLOADER_MIDDLEWARES = {
+    "scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware": None,
+    "osint.middlewares.CrawlDelayRobotsTxtMiddleware": 100,
+}
+
+# Frontière persistante (table crawl_frontier) : intervalles de revisite en secondes
+FRONTIER_MIN_REVISIT = 15 * 60
+FRONTIER_DEFAULT_REVISIT = 24 * 3600
+FRONTIER_MAX_REVISIT = 7 * 24 * 3600
+FRONTIER_BATCH_SIZE = 5000
+# Abandon d'une URL après N échecs consécutifs (immédiat sur 404/410)
+FRONTIER_MAX_FAILURES = 5
 
 DEFAULT_REQUEST_HEADERS = {
     'User-Agent': 'OSINT-Research-Bot/0.1 (+contact: research@example.org)'
@@ -1,6 +1,7 @@
 import hashlib
 import scrapy
 import trafilatura
+from osint.frontier import FrontierMixin
 
 ARTICLE_PATTERNS = (
     "/blog/", "/article/", "/research/", "/topics/", "/essays/",
@@ -15,18 +16,28 @@ def looks_like_article(url: str) -> bool:
         return False
     return any(p in url.lower() for p in ARTICLE_PATTERNS)
 
-class BrookingsSpider(scrapy.Spider):
+class BrookingsSpider(FrontierMixin, scrapy.Spider):
     name = "brookings"
+    frontier_seed_kind = "sitemap_index"
+    frontier_callbacks = {"sitemap_index": "parse", "sitemap": "parse_map", "article": "parse_article"}
     custom_settings = {"DOWNLOAD_DELAY": 1.5, "AUTOTHROTTLE_ENABLED": True}
     allowed_domains = ["brookings.edu"]
     start_urls = ["https://www.brookings.edu/sitemap_index.xml"]
 
     def parse(self, resp):
-        # Suivre tous les sous-sitemaps (xml ou xml.gz)
-        for loc in resp.xpath("//*[local-name()='loc']/text()").getall():
-            yield scrapy.Request(loc, callback=self.parse_map, dont_filter=True)
+        self.mark_fetched(resp)
+        # Suivre les sous-sitemaps (xml ou xml.gz) nouveaux ou modifiés depuis le dernier passage
+        for sitemap in resp.xpath("//*[local-name()='sitemap']"):
+            loc = sitemap.xpath("*[local-name()='loc']/text()").get()
+            lastmod = sitemap.xpath("*[local-name()='lastmod']/text()").get()
+            if not loc:
+                continue
+            request = self.follow_frontier(loc.strip(), "sitemap", lastmod=lastmod)
+            if request:
+                yield request
 
     def parse_map(self, resp):
+        self.mark_fetched(resp)
         # Chaque sitemap peut contenir soit d'autres sitemaps, soit des URLs finales
         # Traiter chaque entrée <url> du sitemap
         for url_entry in resp.xpath("//*[local-name()='url']"):
@@ -39,18 +50,23 @@ class BrookingsSpider(scrapy.Spider):
             url = loc.strip()
             if url.endswith(".xml") or url.endswith(".xml.gz"):
                 # encore un sitemap → on descend
-                yield scrapy.Request(url, callback=self.parse_map, dont_filter=True)
-            else:
+                request = self.follow_frontier(url, "sitemap")
+            elif looks_like_article(url):
                 # URL finale : on ne garde que les pages qui ressemblent à des articles
-                if looks_like_article(url):
-                    # Passer la date lastmod en meta
-                    yield scrapy.Request(url, callback=self.parse_article, meta={'lastmod': lastmod})
+                # (re-téléchargées seulement si lastmod est postérieur au dernier passage)
+                request = self.follow_frontier(url, "article", meta={'lastmod': lastmod}, lastmod=lastmod)
+            else:
+                request = None
+            if request:
+                yield request
 
     def parse_article(self, resp):
         # On s'assure que c'est bien une page HTML
         ctype = resp.headers.get("Content-Type", b"text/html").decode("utf-8").lower()
         if "html" not in ctype:
-            return  # ignore images, pdf, etc.
+            # ignore images, pdf, etc. (aucun item : on marque l'URL faite ici)
+            self.mark_fetched(resp)
+            return
 
         title = resp.css("h1::text").get() or resp.css("title::text").get()
         
@@ -4,9 +4,12 @@ import trafilatura
 from datetime import datetime
 import xml.etree.ElementTree as ET
 from email.utils import parsedate_to_datetime
+from osint.frontier import FrontierMixin
 
-class IrisRSSSpider(scrapy.Spider):
+class IrisRSSSpider(FrontierMixin, scrapy.Spider):
     name = "french_think_tanks_rss"
+    frontier_seed_kind = "feed"
+    frontier_callbacks = {"feed": "parse", "article": "parse_full_article"}
     custom_settings = {
         "DOWNLOAD_DELAY": 1.0,
         "AUTOTHROTTLE_ENABLED": True,
@@ -25,6 +28,7 @@ class IrisRSSSpider(scrapy.Spider):
     ]
 
     def parse(self, response):
+        self.mark_fetched(response)
         # Parser le flux RSS
         try:
             root = ET.fromstring(response.text)
@@ -71,12 +75,11 @@ class IrisRSSSpider(scrapy.Spider):
                         continue
                 
                 # Si pas de content:encoded ou si l'extraction échoue, aller chercher le contenu sur la page
+                # (via la frontière : un article déjà collecté n'est pas re-téléchargé)
                 if rss_item['url']:
-                    yield scrapy.Request(
-                        url=rss_item['url'],
-                        callback=self.parse_full_article,
-                        meta={'rss_item': rss_item}
-                    )
+                    request = self.follow_frontier(rss_item['url'], 'article', meta={'rss_item': rss_item})
+                    if request:
+                        yield request
                 else:
                     # Sinon, utiliser juste la description du RSS
                     rss_item['content_text'] = self.clean_html_description(rss_item.get('description', ''))
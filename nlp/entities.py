@@ -0,0 +1,149 @@
+import re
+import unicodedata
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
+
+from psycopg2.extras import execute_values
+
+# Articles en tête d'entité ("la Russie", "l'Union européenne", "the United States"),
+# ignorés uniquement pour construire la clé de recherche des alias
+LEADING_ARTICLES = re.compile(r"^(?:(?:le|la|les|the)\s+|l['’]\s*)", re.IGNORECASE)
+
+# Limite du nombre d'entités par document pour le graphe : n entités => n(n-1)/2 paires
+MAX_ENTITIES_PER_DOC = 30
+
+
+def alias_key(text):
+    """Clé de recherche d'un alias : sans article, sans accents, en minuscules"""
+    text = LEADING_ARTICLES.sub("", " ".join(text.split()))
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.casefold()
+
+
+class EntityNormalizer:
+    """Ramène les formes de surface des entités à un nom canonique via la table entity_aliases"""
+
+    def __init__(self, aliases=None, cache_size=50000):
+        self.aliases = {}
+        self.canonicalize = lru_cache(maxsize=cache_size)(self._canonicalize)
+        if aliases:
+            self.add_aliases(aliases)
+
+    def add_aliases(self, aliases):
+        """Ajoute des couples (alias, canonique) et invalide le cache"""
+        for alias, canonical in aliases:
+            self.aliases[alias_key(alias)] = canonical
+        self.canonicalize.cache_clear()
+
+    def load_aliases(self, cur):
+        """Charge la table entity_aliases depuis la base"""
+        cur.execute("SELECT alias, canonical FROM entity_aliases")
+        self.add_aliases(cur.fetchall())
+
+    def _canonicalize(self, text):
+        key = alias_key(text)
+        if key in self.aliases:
+            return self.aliases[key]
+        # Pas d'alias connu : forme de surface inchangée ("Le Pen", "La Paz", "The Hague")
+        return " ".join(text.split())
+
+
+def week_start(date):
+    """Début de la fenêtre hebdomadaire (lundi) contenant la date"""
+    return date - timedelta(days=date.weekday())
+
+
+def _document_pairs(window_start, mentions):
+    """Arêtes du document : paires triées (entity_a < entity_b) parmi ses entités principales.
+
+    Sélection déterministe (mentions décroissantes puis nom) pour pouvoir
+    retirer exactement les mêmes paires lors d'une reconstruction.
+    """
+    ranked = sorted(mentions.items(), key=lambda item: (-item[1], item[0]))
+    top = sorted(name for name, _ in ranked[:MAX_ENTITIES_PER_DOC])
+    return [(window_start, a, b) for i, a in enumerate(top) for b in top[i + 1:]]
+
+
+def remove_document_entities(cur, doc_id):
+    """Retire un document de entity_documents et décrémente ses paires de co-occurrence"""
+    cur.execute(
+        "SELECT entity, window_start, mentions FROM entity_documents WHERE doc_id = %s",
+        (doc_id,),
+    )
+    rows = cur.fetchall()
+    if not rows:
+        return False
+
+    mentions = Counter({entity: count for entity, _, count in rows})
+    pairs = _document_pairs(rows[0][1], mentions)
+    if pairs:
+        execute_values(
+            cur,
+            """
+            UPDATE entity_cooccurrence c
+            SET doc_count = c.doc_count - 1
+            FROM (VALUES %s) AS p (window_start, entity_a, entity_b)
+            WHERE c.window_start = p.window_start::date
+              AND c.entity_a = p.entity_a COLLATE "C"
+              AND c.entity_b = p.entity_b COLLATE "C"
+            """,
+            pairs,
+        )
+        cur.execute(
+            "DELETE FROM entity_cooccurrence WHERE window_start = %s AND doc_count <= 0",
+            (rows[0][1],),
+        )
+    cur.execute("DELETE FROM entity_documents WHERE doc_id = %s", (doc_id,))
+    return True
+
+
+def store_document_entities(cur, doc_id, window_start, entities, rebuild=False):
+    """Met à jour entity_documents et le graphe de co-occurrence pour un document.
+
+    Un document déjà enregistré est ignoré, ce qui rend le traitement incrémental
+    et permet de relancer le pipeline sans doubler les compteurs. Avec
+    rebuild=True, ses anciennes lignes sont d'abord retirées (après une
+    modification de entity_aliases par exemple).
+    """
+    if rebuild:
+        remove_document_entities(cur, doc_id)
+    else:
+        cur.execute("SELECT 1 FROM entity_documents WHERE doc_id = %s LIMIT 1", (doc_id,))
+        if cur.fetchone():
+            return False
+
+    mentions = Counter()
+    labels = {}
+    for entity in entities:
+        mentions[entity.canonical] += 1
+        labels.setdefault(entity.canonical, entity.label)
+
+    if not mentions:
+        return False
+
+    execute_values(
+        cur,
+        """
+        INSERT INTO entity_documents (doc_id, entity, label, window_start, mentions)
+        VALUES %s
+        ON CONFLICT (doc_id, entity) DO NOTHING
+        """,
+        [(doc_id, name, labels[name], window_start, count) for name, count in mentions.items()],
+    )
+
+    pairs = _document_pairs(window_start, mentions)
+    if pairs:
+        execute_values(
+            cur,
+            """
+            INSERT INTO entity_cooccurrence (window_start, entity_a, entity_b, doc_count)
+            VALUES %s
+            ON CONFLICT (window_start, entity_a, entity_b)
+            DO UPDATE SET doc_count = entity_cooccurrence.doc_count + 1
+            """,
+            pairs,
+            template="(%s, %s, %s, 1)",
+        )
+    return True
@@ -1,3 +1,4 @@
+import argparse
 import spacy
 import re
 import os
@@ -5,9 +6,18 @@ import psycopg2
 from langdetect import detect
 from datetime import datetime
 import json
+import logging
+from common.metrics import flush, inc, profiled, registry, setup_from_env, timed
+from entities import EntityNormalizer, store_document_entities, week_start
+from results import DocumentResult, Entity, Event
+
+logger = logging.getLogger(__name__)
 
 class GeopoliticalNLP:
-    def __init__(self):
+    def __init__(self, normalizer=None):
+        # Normalisation des entités ("la Russie", "Russie" -> "Russia")
+        self.normalizer = normalizer or EntityNormalizer()
+
         # On va utiliser les modèles de base pour commencer
         # Si tu veux installer les gros modèles plus tard: python -m spacy download en_core_web_trf
         try:
@@ -40,10 +50,11 @@ class GeopoliticalNLP:
         
     def detect_language(self, text):
         """Détecte la langue du texte"""
-        try:
-            return detect(text[:1000])  # Utilise les 1000 premiers chars pour la détection
-        except:
-            return "en"  # Défaut anglais
+        with timed("nlp_stage_seconds", stage="language_detection"):
+            try:
+                return detect(text[:1000])  # Utilise les 1000 premiers chars pour la détection
+            except:
+                return "en"  # Défaut anglais
             
     def extract_entities(self, text, language="en"):
         """Extrait les entités nommées (pays, orgs, personnes)"""
@@ -51,74 +62,72 @@ class GeopoliticalNLP:
         if not nlp:
             return []
             
-        doc = nlp(text)
+        with timed("nlp_stage_seconds", stage="spacy_parse"):
+            doc = nlp(text)
         entities = []
         
         for ent in doc.ents:
             if ent.label_ in ("GPE", "ORG", "PERSON", "NORP"):  # Geo, Org, Person, Nationalities
-                entities.append({
-                    "text": ent.text,
-                    "label": ent.label_,
-                    "start": ent.start_char,
-                    "end": ent.end_char
-                })
+                entities.append(Entity(
+                    label=ent.label_,
+                    canonical=self.normalizer.canonicalize(ent.text),
+                    start=ent.start_char,
+                    end=ent.end_char
+                ))
                 
         return entities
         
     def detect_events(self, text, language="en"):
-        """Détecte les événements géopolitiques dans le texte"""
+        """Détecte les événements géopolitiques dans le texte (offsets des mots-clés)"""
         events = []
-        text_lower = text.lower()
-        
-        # Extraire les entités pour context
-        entities = self.extract_entities(text, language)
-        countries = [e["text"] for e in entities if e["label"] in ("GPE", "NORP")]
-        orgs = [e["text"] for e in entities if e["label"] == "ORG"]
         
         # Détecter chaque type d'événement
-        for event_type, patterns in self.event_patterns.items():
-            pattern = patterns.get(language, patterns["en"])
-            
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                # Contexte autour du match (50 chars avant/après)
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end]
+        with timed("nlp_stage_seconds", stage="regex_events"):
+            for event_type, patterns in self.event_patterns.items():
+                pattern = patterns.get(language, patterns["en"])
                 
-                events.append({
-                    "event_type": event_type,
-                    "keyword": match.group(),
-                    "context": context,
-                    "targets": countries[:3],  # Max 3 pays pour éviter le bruit
-                    "organizations": orgs[:3],
-                    "confidence": 0.6,  # Score de base
-                    "position": match.start()
-                })
+                # Recherche directe sur le texte (IGNORECASE) : les offsets restent valides
+                for match in re.finditer(pattern, text, re.IGNORECASE):
+                    events.append(Event(event_type, match.start(), match.end()))
                 
         return events
         
     def process_document(self, doc_id, title, content):
         """Traite un document complet"""
-        language = self.detect_language(content)
+        with timed("nlp_document_seconds"), profiled("process_document"):
+            language = self.detect_language(content)
+            
+            # Traiter titre + contenu
+            full_text = f"{title or ''} {content or ''}"
+            
+            entities = self.extract_entities(full_text, language)
+            events = self.detect_events(full_text, language)
         
-        # Traiter titre + contenu
-        full_text = f"{title or ''} {content or ''}"
+        inc("nlp_documents_total", language=language)
+        inc("nlp_events_total", value=len(events))
         
-        entities = self.extract_entities(full_text, language)
-        events = self.detect_events(full_text, language)
+        # Cibles et organisations partagées par tous les événements du document
+        countries = list(dict.fromkeys(e.canonical for e in entities if e.label in ("GPE", "NORP")))
+        orgs = list(dict.fromkeys(e.canonical for e in entities if e.label == "ORG"))
         
-        return {
-            "doc_id": doc_id,
-            "language": language,
-            "entities": entities,
-            "events": events,
-            "processed_at": datetime.now().isoformat()
-        }
+        return DocumentResult(
+            doc_id=doc_id,
+            language=language,
+            text=full_text,
+            processed_at=datetime.now().isoformat(),
+            entities=entities,
+            events=events,
+            targets=countries[:3],  # Max 3 pays pour éviter le bruit
+            organizations=orgs[:3]
+        )
+
+def process_iris_articles(rebuild=False):
+    """Traite tous les articles IRIS en base et renvoie le nombre de documents traités.
 
-def process_iris_articles():
-    """Traite tous les articles IRIS en base"""
-    nlp_processor = GeopoliticalNLP()
+    rebuild=True recalcule les entités déjà enregistrées (après une
+    modification de entity_aliases) au lieu de les ignorer.
+    """
+    setup_from_env()
     
     # Connexion DB
     conn = psycopg2.connect(
@@ -131,43 +140,77 @@ def process_iris_articles():
     
     cur = conn.cursor()
     
-    # Récupérer tous les articles IRIS
-    cur.execute("""
-        SELECT id, title, content_text 
-        FROM rss_feeds 
-        WHERE source = 'iris' 
-        AND content_text IS NOT NULL
-    """)
+    normalizer = EntityNormalizer()
+    normalizer.load_aliases(cur)
+    nlp_processor = GeopoliticalNLP(normalizer)
     
-    articles = cur.fetchall()
-    print(f"Traitement de {len(articles)} articles IRIS...")
+    # Récupérer tous les articles IRIS
+    with timed("db_query_seconds", operation="select_articles"):
+        cur.execute("""
+            SELECT id, title, content_text, COALESCE(date_published, date_collected)
+            FROM rss_feeds 
+            WHERE source = 'iris' 
+            AND content_text IS NOT NULL
+        """)
+        articles = cur.fetchall()
+    logger.info("Traitement de %d articles IRIS...", len(articles))
     
-    results = []
-    for article_id, title, content in articles:
-        print(f"Traitement article {article_id}: {title[:50]}...")
+    processed = 0
+    # Sérialisation JSON au fil de l'eau : un seul résultat (et son texte) en mémoire à la fois.
+    # Écrit dans un fichier temporaire puis renommé : le dashboard ne lit jamais un JSON tronqué
+    with open('nlp_results.json.tmp', 'w', encoding='utf-8') as output:
+        output.write("[")
+        for article_id, title, content, date_ref in articles:
+            logger.debug("Traitement article %s: %s...", article_id, (title or "")[:50])
         
-        result = nlp_processor.process_document(article_id, title, content)
-        results.append(result)
+            result = nlp_processor.process_document(article_id, title, content)
+            processed += 1
         
-        # Afficher résumé
-        print(f"  - Langue: {result['language']}")
-        print(f"  - Entités: {len(result['entities'])}")
-        print(f"  - Événements: {len(result['events'])}")
+            # Mise à jour incrémentale du graphe de co-occurrence
+            with timed("db_query_seconds", operation="store_entities"):
+                store_document_entities(cur, article_id, week_start(date_ref.date()), result.entities, rebuild=rebuild)
         
-        # Afficher événements détectés
-        for event in result['events']:
-            print(f"    * {event['event_type']}: '{event['keyword']}' (targets: {event['targets']})")
+            # Sauvegarder en JSON pour le dashboard
+            if processed > 1:
+                output.write(",")
+            output.write("\n")
+            json.dump(result.to_dict(), output, ensure_ascii=False, indent=2)
+        
+            # Résumé par article (visible avec LOG_LEVEL=DEBUG)
+            logger.debug(
+                "  - Langue: %s, Entités: %d, Événements: %d",
+                result.language, len(result.entities), len(result.events),
+            )
+            for event in result.events:
+                logger.debug("    * %s: '%s' (targets: %s)", event.event_type, result.event_keyword(event), result.targets)
     
-    # Sauvegarder en JSON pour le dashboard
-    with open('nlp_results.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+        output.write("\n]\n")
+    os.replace('nlp_results.json.tmp', 'nlp_results.json')
         
-    print(f"\nRésultats sauvegardés dans nlp_results.json")
+    logger.info("Résultats sauvegardés dans nlp_results.json")
     
+    conn.commit()
     cur.close()
     conn.close()
     
-    return results
+    # Temps passé par étape
+    for (name, labels), hist in sorted(registry.histograms.items()):
+        if hist.count:
+            logger.info(
+                "%s%s: %d appels, %.2fs (moy. %.1f ms)",
+                name, dict(labels), hist.count, hist.sum, hist.sum / hist.count * 1000,
+            )
+    flush()
+    
+    return processed
 
 if __name__ == "__main__":
-    results = process_iris_articles()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline NLP géopolitique (articles IRIS)")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="recalcule entity_documents / entity_cooccurrence pour les documents déjà traités",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+    process_iris_articles(rebuild=args.rebuild)
\ No newline at end of file
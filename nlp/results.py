@@ -0,0 +1,77 @@
+"""Représentation compacte des résultats NLP.
+
+Les entités et événements ne stockent que des offsets dans le texte du document ;
+les listes de cibles et d'organisations sont partagées au niveau du document.
+La conversion en dict (JSON / SQL) ne se fait qu'en sortie, via to_dict().
+"""
+from dataclasses import dataclass, field
+
+# Taille du contexte autour d'un mot-clé (caractères avant/après)
+CONTEXT_CHARS = 50
+
+
+@dataclass(slots=True)
+class Entity:
+    label: str
+    canonical: str
+    start: int
+    end: int
+
+
+@dataclass(slots=True)
+class Event:
+    event_type: str
+    start: int
+    end: int
+    confidence: float = 0.6
+
+
+@dataclass(slots=True)
+class DocumentResult:
+    doc_id: int
+    language: str
+    text: str
+    processed_at: str
+    entities: list = field(default_factory=list)
+    events: list = field(default_factory=list)
+    targets: list = field(default_factory=list)
+    organizations: list = field(default_factory=list)
+
+    def entity_text(self, entity):
+        return self.text[entity.start:entity.end]
+
+    def event_keyword(self, event):
+        return self.text[event.start:event.end].lower()
+
+    def event_context(self, event):
+        return self.text[max(0, event.start - CONTEXT_CHARS):event.end + CONTEXT_CHARS]
+
+    def to_dict(self):
+        """Sérialisation pour nlp_results.json (le texte complet n'est pas exporté)"""
+        return {
+            "doc_id": self.doc_id,
+            "language": self.language,
+            "entities": [
+                {
+                    "text": self.entity_text(e),
+                    "label": e.label,
+                    "canonical": e.canonical,
+                    "start": e.start,
+                    "end": e.end,
+                }
+                for e in self.entities
+            ],
+            "events": [
+                {
+                    "event_type": ev.event_type,
+                    "keyword": self.event_keyword(ev),
+                    "context": self.event_context(ev),
+                    "confidence": ev.confidence,
+                    "position": ev.start,
+                }
+                for ev in self.events
+            ],
+            "targets": self.targets,
+            "organizations": self.organizations,
+            "processed_at": self.processed_at,
+        }